@@ -1,11 +1,12 @@
 """
 Generate sample flight data for demonstration purposes
 """
-import random
 import math
 from datetime import datetime, timedelta
 from typing import List, Dict
 
+import numpy as np
+
 
 def generate_sample_flights(
     home_lat: float,
@@ -14,10 +15,11 @@ def generate_sample_flights(
     num_aircraft: int = 20
 ) -> List[Dict]:
     """Generate realistic sample flight data"""
-    flights = []
+    rng = np.random.default_rng()
     
     # Typical callsign prefixes
     airlines = ['BAW', 'AAL', 'UAL', 'DAL', 'EZY', 'RYR', 'DLH', 'AFR', 'KLM', 'SWA']
+    countries = ['United States', 'United Kingdom', 'Germany', 'France']
     
     # Yesterday's time range
     now = datetime.now()
@@ -28,60 +30,70 @@ def generate_sample_flights(
     # Convert miles to degrees (approximate)
     radius_degrees = radius_miles / 69.0
     
-    for i in range(num_aircraft):
-        # Generate a unique aircraft
-        icao24 = f"{random.randint(100000, 999999):06x}"
-        airline = random.choice(airlines)
-        flight_num = random.randint(1, 9999)
-        callsign = f"{airline}{flight_num}"
-        
-        # Generate flight path
-        num_observations = random.randint(5, 15)
-        
-        # Random entry/exit points
-        entry_angle = random.uniform(0, 2 * math.pi)
-        exit_angle = entry_angle + math.pi + random.uniform(-0.5, 0.5)
-        
-        # Random altitude (in meters)
-        altitude = random.randint(3000, 12000)
-        
-        # Random time during the day
-        flight_start = start_time + timedelta(
-            seconds=random.randint(0, int((end_time - start_time).total_seconds()))
+    # Per-aircraft properties, all generated in one batch
+    icao24s = rng.integers(100000, 999999, size=num_aircraft, endpoint=True)
+    callsign_airlines = rng.choice(airlines, size=num_aircraft)
+    flight_nums = rng.integers(1, 9999, size=num_aircraft, endpoint=True)
+    num_observations = rng.integers(5, 15, size=num_aircraft, endpoint=True)
+    
+    # Random entry/exit points
+    entry_angle = rng.uniform(0, 2 * math.pi, size=num_aircraft)
+    exit_angle = entry_angle + math.pi + rng.uniform(-0.5, 0.5, size=num_aircraft)
+    
+    # Random altitude (in meters)
+    altitude = rng.integers(3000, 12000, size=num_aircraft, endpoint=True)
+    
+    # Random time during the day
+    flight_start = int(start_time.timestamp()) + rng.integers(
+        0, int((end_time - start_time).total_seconds()), size=num_aircraft, endpoint=True
+    )
+    
+    # Observations along each path: aircraft index and position in its path for every state
+    aircraft = np.repeat(np.arange(num_aircraft), num_observations)
+    total = len(aircraft)
+    observation = np.arange(total) - (np.cumsum(num_observations) - num_observations)[aircraft]
+    progress = observation / (num_observations[aircraft] - 1)
+    
+    current_angle = entry_angle[aircraft] + (exit_angle - entry_angle)[aircraft] * progress
+    distance = radius_degrees * rng.uniform(0.3, 1.2, size=total)
+    
+    # Add some noise
+    lat = home_lat + distance * np.sin(current_angle) + rng.normal(0, 0.005, size=total)
+    lon = home_lon + distance * np.cos(current_angle) + rng.normal(0, 0.005, size=total)
+    
+    current_altitude = altitude[aircraft] + rng.normal(0, 200, size=total)
+    timestamp = flight_start[aircraft] + observation * 30
+    
+    icao24 = [f"{value:06x}" for value in icao24s.tolist()]
+    callsign = [f"{airline}{num}" for airline, num in zip(callsign_airlines.tolist(), flight_nums.tolist())]
+    
+    flights = [
+        {
+            'icao24': icao24[a],
+            'callsign': callsign[a],
+            'origin_country': country,
+            'timestamp': ts,
+            'longitude': lo,
+            'latitude': la,
+            'altitude': alt,
+            'on_ground': False,
+            'velocity': vel,
+            'heading': hdg,
+            'vertical_rate': vrate,
+            'geo_altitude': alt
+        }
+        for a, country, ts, lo, la, alt, vel, hdg, vrate in zip(
+            aircraft.tolist(),
+            rng.choice(countries, size=total).tolist(),
+            timestamp.tolist(),
+            lon.tolist(),
+            lat.tolist(),
+            current_altitude.tolist(),
+            rng.uniform(200, 250, size=total).tolist(),
+            (np.degrees(current_angle) % 360).tolist(),
+            rng.normal(0, 2, size=total).tolist()
         )
-        
-        # Generate observations along the path
-        for j in range(num_observations):
-            progress = j / (num_observations - 1)
-            
-            current_angle = entry_angle + (exit_angle - entry_angle) * progress
-            distance = radius_degrees * random.uniform(0.3, 1.2)
-            
-            lat = home_lat + distance * math.sin(current_angle)
-            lon = home_lon + distance * math.cos(current_angle)
-            
-            # Add some noise
-            lat += random.gauss(0, 0.005)
-            lon += random.gauss(0, 0.005)
-            
-            current_altitude = altitude + random.gauss(0, 200)
-            
-            timestamp = int((flight_start + timedelta(seconds=j * 30)).timestamp())
-            
-            flights.append({
-                'icao24': icao24,
-                'callsign': callsign,
-                'origin_country': random.choice(['United States', 'United Kingdom', 'Germany', 'France']),
-                'timestamp': timestamp,
-                'longitude': lon,
-                'latitude': lat,
-                'altitude': current_altitude,
-                'on_ground': False,
-                'velocity': random.uniform(200, 250),
-                'heading': math.degrees(current_angle) % 360,
-                'vertical_rate': random.gauss(0, 2),
-                'geo_altitude': current_altitude
-            })
+    ]
     
     print(f"Generated {len(flights)} sample flight states for {num_aircraft} aircraft")
     return flights
@@ -1,35 +1,52 @@
 """
 Enrich flight data with origin and destination information
 """
+import orjson
 import requests
-import time
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+from fetch_flights import RateLimiter, create_session, worker_pool
 
-def enrich_with_routes(approaches: List[Dict], api_key: str) -> List[Dict]:
+
+def enrich_with_routes(approaches: List[Dict], api_key: str, max_workers: int = 8) -> List[Dict]:
     """
     Enrich flight approaches with origin and destination airport codes
-    Makes additional API calls to FlightRadar24 for flight details
+    Makes additional API calls to FlightRadar24 for flight details (concurrently, rate limited)
     """
     if not approaches:
         return approaches
     
     print(f"Fetching route details for {len(approaches)} flights...")
-    enriched = []
     
-    for i, approach in enumerate(approaches, 1):
-        callsign = approach.get('callsign')
-        
-        if not callsign:
-            # No callsign, can't look up route
-            enriched.append(approach)
-            continue
+    # Rate limiting - don't hammer the API (same pace as the old 0.5s gap between calls)
+    limiter = RateLimiter(requests_per_second=2)
+    session = create_session(max_workers)
+    
+    def lookup(callsign: str) -> tuple:
+        limiter.wait()
+        return _fetch_flight_route(callsign, api_key, session)
+    
+    with worker_pool(max_workers) as executor:
+        # One lookup per distinct callsign (no callsign, can't look up route)
+        lookups = {}
+        for approach in approaches:
+            callsign = (approach.get('callsign') or '').strip()
+            if callsign and callsign not in lookups:
+                lookups[callsign] = executor.submit(lookup, callsign)
         
-        try:
-            # Fetch flight details from FR24 API
+        # Report in input order as results come in
+        for i, approach in enumerate(approaches, 1):
+            callsign = (approach.get('callsign') or '').strip()
+            if not callsign:
+                continue
+            
             print(f"  [{i}/{len(approaches)}] Looking up {callsign}...", end=' ')
             
-            origin, destination = _fetch_flight_route(callsign, api_key)
+            try:
+                origin, destination = lookups[callsign].result()
+            except Exception as e:
+                print(f"✗ Error: {e}")
+                continue
             
             if origin or destination:
                 approach['origin'] = origin
@@ -37,22 +54,12 @@ def enrich_with_routes(approaches: List[Dict], api_key: str) -> List[Dict]:
                 print(f"✓ {origin or '?'} → {destination or '?'}")
             else:
                 print("✗ No route data")
-            
-            enriched.append(approach)
-            
-            # Rate limiting - don't hammer the API
-            if i < len(approaches):
-                time.sleep(0.5)
-                
-        except Exception as e:
-            print(f"✗ Error: {e}")
-            enriched.append(approach)
     
     print()
-    return enriched
+    return approaches
 
 
-def _fetch_flight_route(callsign: str, api_key: str) -> tuple:
+def _fetch_flight_route(callsign: str, api_key: str, session: Optional[requests.Session] = None) -> tuple:
     """
     Fetch origin and destination for a specific flight
     Returns: (origin_code, destination_code) or (None, None)
@@ -62,7 +69,6 @@ def _fetch_flight_route(callsign: str, api_key: str) -> tuple:
     
     headers = {
         "Accept": "application/json",
-        "Accept-Encoding": "gzip",
         "Authorization": f"Bearer {api_key}"
     }
     
@@ -71,10 +77,10 @@ def _fetch_flight_route(callsign: str, api_key: str) -> tuple:
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = (session or requests).get(url, headers=headers, params=params, timeout=10)
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # FR24 API structure: data might be in different places depending on endpoint
             # Try to extract origin/destination from response
@@ -1,21 +1,92 @@
 """
 Fetch flight data from FlightRadar24 and OpenSky Network APIs
 """
+import numpy as np
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import json
+from typing import Callable, List, Dict, Optional
+
+
+class RateLimiter:
+    """Space out API calls to a fixed rate, shared safely across threads"""
+    
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second
+        self._next_allowed = time.monotonic()
+        self._paused_until = 0.0  # time.monotonic() deadline set by defer()
+        self._pause_count = 0     # bumped by each defer(), so queued callers notice it
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        """Block until the next call is allowed under the rate budget"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                slot = max(now, self._next_allowed, self._paused_until)
+                self._next_allowed = slot + self.interval
+                pause_count = self._pause_count
+            
+            if slot > now:
+                time.sleep(slot - now)
+            
+            with self._lock:
+                if self._pause_count == pause_count:
+                    return
+            # Another caller deferred while we were queued - take a fresh slot after the pause
+    
+    def defer(self, delay: float) -> float:
+        """
+        Hold every caller for delay seconds on top of the normal spacing (e.g. after a 429)
+        Returns the seconds until calls resume
+        """
+        with self._lock:
+            now = time.monotonic()
+            # Count the pause from the next reserved slot, so the delay adds to the pacing instead of hiding in it
+            self._paused_until = max(self._paused_until, max(now, self._next_allowed) + delay)
+            self._next_allowed = self._paused_until
+            self._pause_count += 1
+            return self._paused_until - now
+
+
+def create_session(pool_size: int) -> requests.Session:
+    """Create a keep-alive Session whose connection pool has room for every worker thread"""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_maxsize=pool_size))
+    return session
+
+
+@contextmanager
+def worker_pool(max_workers: int):
+    """
+    ThreadPoolExecutor that drops queued work if the caller fails or is interrupted (Ctrl-C)
+    A plain `with ThreadPoolExecutor()` would wait for every queued request before re-raising
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        yield executor
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
 
 
 class FlightRadar24Fetcher:
     """Fetch flight data from FlightRadar24 API"""
     
     BASE_URL = "https://fr24api.flightradar24.com/api"
+    MAX_WORKERS = 4  # Chunk requests allowed in flight at once
     
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.session = requests.Session()
+        self.rate_limiter = RateLimiter(requests_per_second=1 / 7)  # Give API more breathing room
+        self.session = create_session(self.MAX_WORKERS)
         self.session.headers.update({
             'Authorization': f'Bearer {api_key}',
             'Accept': 'application/json',
@@ -42,84 +113,105 @@ class FlightRadar24Fetcher:
         print(f"Fetching FlightRadar24 data from {datetime.fromtimestamp(begin_time)} to {datetime.fromtimestamp(end_time)}")
         print(f"  Using {interval_minutes}-minute intervals")
         
-        flights = []
-        current_time = begin_time
         chunk_size = interval_minutes * 60  # Convert minutes to seconds
+        timestamps = list(range(begin_time, end_time, chunk_size))
         
-        while current_time < end_time:
-            retries = 3  # Retry failed requests up to 3 times
-            retry_count = 0
-            
-            while retry_count < retries:
-                try:
-                    params = {
-                        'timestamp': current_time,
-                        'bounds': bounds
-                    }
+        # Chunks are independent, so let their round trips overlap; the rate limiter
+        # paces every request (including retries)
+        with worker_pool(self.MAX_WORKERS) as executor:
+            chunks = [executor.submit(self._fetch_historical_chunk, url, bounds, current_time) for current_time in timestamps]
+            flights = [flight for chunk in chunks for flight in chunk.result()]
+        
+        print(f"Total FR24 states fetched: {len(flights)}")
+        return flights
+    
+    def _fetch_historical_chunk(self, url: str, bounds: str, current_time: int) -> List[Dict]:
+        """Fetch and parse the flights at one timestamp, retrying failed requests"""
+        retries = 3  # Retry failed requests up to 3 times
+        retry_count = 0
+        
+        while retry_count < retries:
+            try:
+                params = {
+                    'timestamp': current_time,
+                    'bounds': bounds
+                }
+                
+                self.rate_limiter.wait()
+                response = self.session.get(url, params=params, timeout=60)  # Increased timeout
+                
+                if response.status_code == 200:
+                    data = orjson.loads(response.content)
                     
-                    response = self.session.get(url, params=params, timeout=60)  # Increased timeout
+                    if 'data' in data and data['data']:
+                        print(f"  ✓ Fetched {len(data['data'])} states at {datetime.fromtimestamp(current_time)}")
+                        return self._parse_fr24_flights(data['data'])
                     
-                    if response.status_code == 200:
-                        data = response.json()
+                    print(f"  - No flights at {datetime.fromtimestamp(current_time)}")
+                    return []  # Success, exit retry loop
                         
-                        if 'data' in data and data['data']:
-                            for flight in data['data']:
-                                flights.append(self._parse_fr24_flight(flight))
-                            print(f"  ✓ Fetched {len(data['data'])} states at {datetime.fromtimestamp(current_time)}")
-                        else:
-                            print(f"  - No flights at {datetime.fromtimestamp(current_time)}")
-                        break  # Success, exit retry loop
-                            
-                    elif response.status_code == 404:
-                        print(f"  - No data for {datetime.fromtimestamp(current_time)}")
-                        break  # No data, exit retry loop
-                    else:
-                        print(f"  ✗ Error {response.status_code} at {datetime.fromtimestamp(current_time)}")
-                        retry_count += 1
-                        if retry_count < retries:
-                            print(f"    Retrying ({retry_count}/{retries})...")
-                            time.sleep(3)
-                        
-                except requests.exceptions.Timeout:
-                    retry_count += 1
-                    print(f"  ✗ Timeout at {datetime.fromtimestamp(current_time)}")
-                    if retry_count < retries:
-                        print(f"    Retrying ({retry_count}/{retries})...")
-                        time.sleep(3)
-                    else:
-                        print(f"    Skipping after {retries} attempts")
-                        
-                except requests.exceptions.RequestException as e:
+                elif response.status_code == 404:
+                    print(f"  - No data for {datetime.fromtimestamp(current_time)}")
+                    return []  # No data, exit retry loop
+                else:
+                    print(f"  ✗ Error {response.status_code} at {datetime.fromtimestamp(current_time)}")
                     retry_count += 1
-                    print(f"  ✗ Request failed: {e}")
                     if retry_count < retries:
                         print(f"    Retrying ({retry_count}/{retries})...")
                         time.sleep(3)
-                    else:
-                        print(f"    Skipping after {retries} attempts")
-                        break
-            
-            time.sleep(7)  # Increased rate limiting - give API more breathing room
-            current_time += chunk_size
+                    
+            except requests.exceptions.Timeout:
+                retry_count += 1
+                print(f"  ✗ Timeout at {datetime.fromtimestamp(current_time)}")
+                if retry_count < retries:
+                    print(f"    Retrying ({retry_count}/{retries})...")
+                    time.sleep(3)
+                else:
+                    print(f"    Skipping after {retries} attempts")
+                    
+            except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+                retry_count += 1
+                print(f"  ✗ Request failed: {e}")
+                if retry_count < retries:
+                    print(f"    Retrying ({retry_count}/{retries})...")
+                    time.sleep(3)
+                else:
+                    print(f"    Skipping after {retries} attempts")
         
-        print(f"Total FR24 states fetched: {len(flights)}")
-        return flights
+        return []
+    
+    def _parse_fr24_flights(self, flights: List[Dict]) -> List[Dict]:
+        """Parse a chunk of FR24 flights, converting all ISO timestamps in one vectorized pass"""
+        # datetime64 parses ISO 8601 natively; strip the UTC 'Z' suffix it doesn't accept
+        raw_timestamps = np.char.rstrip(np.array([flight.get('timestamp') or 'NaT' for flight in flights]), 'Z')
+        epochs = raw_timestamps.astype('datetime64[s]').astype(np.int64).tolist()
+        missing = (raw_timestamps == 'NaT').tolist()
+        
+        return [
+            self._parse_fr24_flight(flight, None if no_timestamp else epoch)
+            for flight, epoch, no_timestamp in zip(flights, epochs, missing)
+        ]
     
-    def _parse_fr24_flight(self, flight: Dict) -> Dict:
+    def _parse_fr24_flight(self, flight: Dict, timestamp: Optional[int]) -> Dict:
         """Parse FR24 flight data - NOW WITH ORIGIN/DESTINATION"""
+        alt = flight.get('alt')
+        gspeed = flight.get('gspeed')
+        vspeed = flight.get('vspeed')
+        altitude = alt * 0.3048 if alt else None  # feet to meters
+        
         return {
             'icao24': flight.get('hex'),
             'callsign': flight.get('callsign'),
             'origin_country': None,
-            'timestamp': int(datetime.fromisoformat(flight['timestamp'].replace('Z', '+00:00')).timestamp()) if flight.get('timestamp') else None,
+            'timestamp': timestamp,
             'longitude': flight.get('lon'),
             'latitude': flight.get('lat'),
-            'altitude': flight.get('alt') * 0.3048 if flight.get('alt') else None,  # feet to meters
-            'on_ground': flight.get('alt', 0) == 0 if flight.get('alt') is not None else False,
-            'velocity': flight.get('gspeed') * 0.514444 if flight.get('gspeed') else None,  # knots to m/s
+            'altitude': altitude,
+            'on_ground': alt == 0 if alt is not None else False,
+            'velocity': gspeed * 0.514444 if gspeed else None,  # knots to m/s
             'heading': flight.get('track'),
-            'vertical_rate': flight.get('vspeed') * 0.00508 if flight.get('vspeed') else None,  # ft/min to m/s
-            'geo_altitude': flight.get('alt') * 0.3048 if flight.get('alt') else None,
+            'vertical_rate': vspeed * 0.00508 if vspeed else None,  # ft/min to m/s
+            'geo_altitude': altitude,
             # ADDED: Extract origin/destination from FR24 API
             'origin_iata': flight.get('orig_iata'),
             'origin_icao': flight.get('orig_icao'),
@@ -150,20 +242,36 @@ class OpenSkyFetcher:
     
     BASE_URL = "https://opensky-network.org/api"
     TOKEN_URL = "https://auth.opensky-network.org/auth/realms/opensky-network/protocol/openid-connect/token"
+    MAX_WORKERS = 4  # Chunk requests allowed in flight at once
+    
+    # Retry policy for rate limiting and transient server errors
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    MAX_RETRIES = 5
+    BACKOFF_BASE = 1.0    # seconds
+    BACKOFF_FACTOR = 1.3  # gentle growth, retries stay close to the rate budget
+    BACKOFF_MAX = 60.0
     
     def __init__(self, client_id: Optional[str] = None, client_secret: Optional[str] = None):
-        self.session = requests.Session()
+        self.rate_limiter = RateLimiter(requests_per_second=10 / 60)  # 10 requests per minute
+        self.session = create_session(self.MAX_WORKERS)
         self.access_token = None
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self._token_expiry = 0.0  # time.monotonic() deadline for refreshing the token
+        self._token_lock = threading.Lock()
+        self._backoff = self.BACKOFF_BASE  # shared by all workers, reset after a successful response
+        self._backoff_lock = threading.Lock()
         
         if client_id and client_secret:
-            self.client_id = client_id
-            self.client_secret = client_secret
             self._get_oauth_token()
     
     def _get_oauth_token(self):
         """Get OAuth2 access token"""
+        # If this attempt fails, wait a minute before asking again
+        self._token_expiry = time.monotonic() + 60
+        
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.TOKEN_URL,
                 data={
                     'grant_type': 'client_credentials',
@@ -175,7 +283,10 @@ class OpenSkyFetcher:
             )
             
             if response.status_code == 200:
-                self.access_token = response.json()['access_token']
+                token = orjson.loads(response.content)
+                self.access_token = token['access_token']
+                # Refresh a minute before the token actually expires
+                self._token_expiry = time.monotonic() + token.get('expires_in', 1800) - 60
                 print("  ✓ OpenSky OAuth2 authentication successful")
             else:
                 print(f"  ✗ OpenSky OAuth2 failed: {response.status_code}")
@@ -183,14 +294,99 @@ class OpenSkyFetcher:
         except Exception as e:
             print(f"  ✗ OpenSky OAuth2 failed: {e}")
     
+    def _ensure_token(self):
+        """Refresh the OAuth2 token when it is about to expire (only one thread refreshes)"""
+        if not (self.client_id and self.client_secret):
+            return
+        
+        with self._token_lock:
+            if time.monotonic() < self._token_expiry:
+                return
+            self._get_oauth_token()
+    
     def _make_request(self, url, params):
-        """Make authenticated request"""
-        headers = {}
-        if self.access_token:
-            headers['Authorization'] = f'Bearer {self.access_token}'
-        return self.session.get(url, params=params, headers=headers, timeout=30)
+        """
+        Make authenticated request, backing off on rate limiting (429) and transient server errors
+        The backoff pauses the shared rate limiter, so every worker slows down together
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            self.rate_limiter.wait()
+            self._ensure_token()
+            headers = {}
+            if self.access_token:
+                headers['Authorization'] = f'Bearer {self.access_token}'
+            response = self.session.get(url, params=params, headers=headers, timeout=30)
+            
+            if 200 <= response.status_code < 300:
+                with self._backoff_lock:
+                    self._backoff = self.BACKOFF_BASE
+            
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES:
+                return response
+            
+            # Honour Retry-After when given, else exponential backoff with jitter
+            retry_after = response.headers.get('Retry-After', '')
+            with self._backoff_lock:
+                backoff = self._backoff
+                self._backoff = min(backoff * self.BACKOFF_FACTOR, self.BACKOFF_MAX)
+            if retry_after.isdigit():
+                delay = min(float(retry_after), self.BACKOFF_MAX)
+            else:
+                delay = backoff + random.uniform(0, backoff / 2)
+            # The retry waits on the limiter like everyone else
+            resume_in = self.rate_limiter.defer(delay)
+            print(f"  ✗ Error {response.status_code}, retrying in {resume_in:.1f}s ({attempt + 1}/{self.MAX_RETRIES})...")
+    
+    def get_flights_in_timerange(
+        self,
+        lat_min: float,
+        lat_max: float,
+        lon_min: float,
+        lon_max: float,
+        begin_time: int,
+        end_time: int,
+        interval_minutes: int = 10,
+        sink: Optional[Callable[[List[Dict]], None]] = None
+    ) -> List[Dict]:
+        """
+        Fetch state vectors in a bounding box, one snapshot per interval
+        If sink is given, each snapshot's states are passed to it in time order instead of
+        being collected, and an empty list is returned (e.g. sink=lambda s: append_flight_data(s, f))
+        """
+        url = f"{self.BASE_URL}/states/all"
+        chunk_size = interval_minutes * 60  # Convert minutes to seconds
+        bbox = {
+            'lamin': lat_min,
+            'lamax': lat_max,
+            'lomin': lon_min,
+            'lomax': lon_max
+        }
+        
+        print(f"Fetching OpenSky data from {datetime.fromtimestamp(begin_time)} to {datetime.fromtimestamp(end_time)}")
+        print(f"  Using {interval_minutes}-minute intervals")
+        
+        # Overlap the round trips of independent chunks; _make_request paces them
+        with worker_pool(self.MAX_WORKERS) as executor:
+            chunks = [
+                executor.submit(self._fetch_states_chunk, url, bbox, current_time)
+                for current_time in range(begin_time, end_time, chunk_size)
+            ]
+            if sink is None:
+                flights = [flight for chunk in chunks for flight in chunk.result()]
+                total = len(flights)
+            else:
+                # Hand over and drop each snapshot so only in-flight chunks are held in memory
+                flights = []
+                total = 0
+                while chunks:
+                    states = chunks.pop(0).result()
+                    total += len(states)
+                    sink(states)
+        
+        print(f"Total OpenSky states fetched: {total}")
+        return flights
     
-    def get_yesterday_flights(self, center_lat: float, center_lon: float, radius_degrees: float) -> List[Dict]:
+    def get_yesterday_flights(self, center_lat: float, center_lon: float, radius_degrees: float, interval_minutes: int = 10) -> List[Dict]:
         """Get yesterday's flights from OpenSky"""
         lat_min = center_lat - radius_degrees
         lat_max = center_lat + radius_degrees
@@ -205,73 +401,69 @@ class OpenSkyFetcher:
         begin_time = int(yesterday_start.timestamp())
         end_time = int(yesterday_end.timestamp())
         
-        url = f"{self.BASE_URL}/states/all"
-        flights = []
-        current_time = begin_time
-        chunk_size = 600
-        
-        print(f"Fetching OpenSky data from {datetime.fromtimestamp(begin_time)} to {datetime.fromtimestamp(end_time)}")
+        return self.get_flights_in_timerange(lat_min, lat_max, lon_min, lon_max, begin_time, end_time, interval_minutes)
+    
+    def _fetch_states_chunk(self, url: str, bbox: Dict, current_time: int) -> List[Dict]:
+        """Fetch and parse the state vectors at one timestamp"""
+        params = {'time': current_time, **bbox}
         
-        while current_time < end_time:
-            params = {
-                'time': current_time,
-                'lamin': lat_min,
-                'lamax': lat_max,
-                'lomin': lon_min,
-                'lomax': lon_max
-            }
+        try:
+            response = self._make_request(url, params)
             
-            try:
-                response = self._make_request(url, params)
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                if data and 'states' in data and data['states']:
+                    print(f"  ✓ Fetched {len(data['states'])} states at {datetime.fromtimestamp(current_time)}")
+                    return [self._parse_state_vector(state, current_time) for state in data['states']]
+                print(f"  - No flights at {datetime.fromtimestamp(current_time)}")
+            elif response.status_code == 404:
+                print(f"  - No data for {datetime.fromtimestamp(current_time)}")
+            else:
+                print(f"  ✗ Error {response.status_code}")
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    if data and 'states' in data and data['states']:
-                        for state in data['states']:
-                            flights.append(self._parse_state_vector(state, current_time))
-                        print(f"  ✓ Fetched {len(data['states'])} states at {datetime.fromtimestamp(current_time)}")
-                    else:
-                        print(f"  - No flights at {datetime.fromtimestamp(current_time)}")
-                elif response.status_code == 404:
-                    print(f"  - No data for {datetime.fromtimestamp(current_time)}")
-                else:
-                    print(f"  ✗ Error {response.status_code}")
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"  ✗ Request failed: {e}")
-            
-            time.sleep(6)  # Rate limiting - 10 requests per minute = 6 second spacing
-            current_time += chunk_size
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            print(f"  ✗ Request failed: {e}")
         
-        print(f"Total OpenSky states fetched: {len(flights)}")
-        return flights
+        return []
     
     def _parse_state_vector(self, state: List, timestamp: int) -> Dict:
         """Parse OpenSky state vector"""
+        # Unpack the positional state vector layout by name in one step
+        (icao24, callsign, origin_country, _time_position, _last_contact, longitude, latitude,
+         altitude, on_ground, velocity, heading, vertical_rate, _sensors, geo_altitude, *_) = state
+        
         return {
-            'icao24': state[0],
-            'callsign': state[1].strip() if state[1] else None,
-            'origin_country': state[2],
+            'icao24': icao24,
+            'callsign': callsign.strip() if callsign else None,
+            'origin_country': origin_country,
             'timestamp': timestamp,
-            'longitude': state[5],
-            'latitude': state[6],
-            'altitude': state[7],
-            'on_ground': state[8],
-            'velocity': state[9],
-            'heading': state[10],
-            'vertical_rate': state[11],
-            'geo_altitude': state[13]
+            'longitude': longitude,
+            'latitude': latitude,
+            'altitude': altitude,
+            'on_ground': on_ground,
+            'velocity': velocity,
+            'heading': heading,
+            'vertical_rate': vertical_rate,
+            'geo_altitude': geo_altitude
         }
 
 
 def save_flight_data(flights: List[Dict], filename: str):
     """Save flight data to JSON file"""
-    with open(filename, 'w') as f:
-        json.dump(flights, f, indent=2)
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(flights, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     print(f"Saved {len(flights)} flight states to {filename}")
 
 
+def append_flight_data(flights: List[Dict], f):
+    """Append flight states to a file opened in binary mode as NDJSON (one state per line)"""
+    option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+    f.write(b''.join(orjson.dumps(flight, option=option) for flight in flights))
+
+
 def load_flight_data(filename: str) -> List[Dict]:
-    """Load flight data from JSON file"""
-    with open(filename, 'r') as f:
-        return json.load(f)
\ No newline at end of file
+    """Load flight data from a JSON file, or an NDJSON file written by append_flight_data"""
+    with open(filename, 'rb') as f:
+        if filename.endswith('.ndjson'):
+            return [orjson.loads(line) for line in f if line.strip()]
+        return orjson.loads(f.read())
\ No newline at end of file
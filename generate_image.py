@@ -1,19 +1,64 @@
 """
 Generate wallpaper visualization from flight data
 """
-import matplotlib.pyplot as plt
-from matplotlib.patches import Circle
+import matplotlib
+matplotlib.use('Agg')  # Render off-screen only, never import a GUI backend
+from matplotlib import font_manager
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.markers import MarkerStyle
+from matplotlib.path import Path
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Tuple
+import math
 import numpy as np
-import contextily as ctx
+import re
+from PIL import Image
+
+
+# Faster line drawing: simplify paths below a pixel and rasterize long paths in chunks
+matplotlib.rcParams['path.simplify'] = True
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+
+# Resolve the fonts used by the labels and stats text once at import
+for family in ('sans-serif', 'monospace'):
+    font_manager.findfont(font_manager.FontProperties(family=[family]))
+    font_manager.findfont(font_manager.FontProperties(family=[family], weight='bold'))
+
+# Plotting fields of an approach, one row per aircraft
+APPROACH_DTYPE = np.dtype([('lat', 'f8'), ('lon', 'f8'), ('alt', 'f8'), ('hdg', 'f8')])
+
+
+def _write_images(rgba: bytes, size: Tuple[int, int], paths: Tuple[str, ...]):
+    """Encode an RGBA canvas buffer to each path (PNG or JPG by extension); runs in a worker process too"""
+    image = Image.frombuffer('RGBA', size, rgba, 'raw', 'RGBA', 0, 1).convert('RGB')
+    for path in paths:
+        if path.lower().endswith('.png'):
+            image.save(path, optimize=False, compress_level=1)
+        else:
+            image.save(path, format='JPEG', quality=90)
 
 
 class WallpaperGenerator:
     """Generate stylish wallpaper from flight data"""
     
-    def __init__(self, config: Dict):
+    # Airline code + flight number, e.g. "RYR9630"
+    CALLSIGN_RE = re.compile(r'^([A-Z]{2,3})(\d+.*)$')
+    
+    # Reusable (fig, ax) per (width, height, dpi), see _get_figure
+    _figures = {}
+    
+    def __init__(self, config: Dict, background_save: bool = False):
         self.config = config
+        # Opt-in: encode images in a worker process while the next wallpaper renders (call wait() before exiting)
+        # Usually slower than saving in-process, the buffer copy and pickling outweigh the short encode
+        self.background_save = background_save
+        self._save_pool = None  # created on the first background save, shut down by wait()
+        self._pending_saves = []  # (future, message) pairs, message printed once the files exist
         # Override config for neon pink radar phone wallpaper
         self.width = 1080   # Phone width
         self.height = 2316  # 19.3:9 aspect ratio
@@ -23,13 +68,59 @@ class WallpaperGenerator:
         self.text_color = '#ff85c0'  # Lighter/softer pink for text (less bright than radar)
         self.radar_color = '#ff1493'  # Neon pink for radar circles (brightest)
         
+    @classmethod
+    def _get_figure(cls, width: int, height: int, dpi: int = 100):
+        """
+        Get a cleared figure and axes for the given pixel size
+        Figures are created once per size and reused, avoiding canvas/renderer setup on every wallpaper
+        """
+        key = (width, height, dpi)
+        if key not in cls._figures:
+            # Plain Figure on an Agg canvas - no pyplot state machine or global figure registry
+            fig = Figure(figsize=(width/dpi, height/dpi), dpi=dpi)
+            FigureCanvasAgg(fig)
+            cls._figures[key] = (fig, fig.add_subplot())
+        fig, ax = cls._figures[key]
+        ax.clear()
+        for text in list(fig.texts):
+            text.remove()
+        return fig, ax
+    
+    def _save_figure(self, fig, *paths: str, message: str):
+        """
+        Render the figure once and write it to each path (PNG or JPG by extension) with Pillow
+        message is printed once the files are written (from wait() when saving in the background)
+        """
+        fig.canvas.draw()
+        size = fig.canvas.get_width_height()
+        if not self.background_save:
+            _write_images(fig.canvas.buffer_rgba(), size, paths)
+            print(message)
+            return
+        if self._save_pool is None:
+            self._save_pool = ProcessPoolExecutor(max_workers=1)
+        # Copy the pixels out, the figure is reused for the next wallpaper
+        rgba = bytes(fig.canvas.buffer_rgba())
+        future = self._save_pool.submit(_write_images, rgba, size, paths)
+        self._pending_saves.append((future, message))
+    
+    def wait(self):
+        """Block until all background image saves have finished and shut the save pool down (re-raises any save error)"""
+        pending, self._pending_saves = self._pending_saves, []
+        try:
+            for future, message in pending:
+                future.result()
+                print(message)
+        finally:
+            if self._save_pool is not None:
+                self._save_pool.shutdown(cancel_futures=True)
+                self._save_pool = None
+    
     def create_wallpaper(self, home_lat: float, home_lon: float, approaches: List[Dict], stats: Dict, output_path: str):
         """Create the wallpaper image"""
         dpi = 100
-        fig_width = self.width / dpi
-        fig_height = self.height / dpi
         
-        fig, ax = plt.subplots(figsize=(fig_width, fig_height), dpi=dpi)
+        fig, ax = self._get_figure(self.width, self.height, dpi)
         fig.patch.set_facecolor(self.bg_color)
         ax.set_facecolor(self.bg_color)
         
@@ -46,20 +137,12 @@ class WallpaperGenerator:
         ax.spines['left'].set_visible(False)
         
         # Remove all padding to fill entire screen
-        plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
+        fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
         
-        # Save PNG - use fixed figure size (no bbox_inches to prevent shifting)
-        plt.savefig(output_path, dpi=dpi, facecolor=self.bg_color, edgecolor='none', pad_inches=0)
-        
-        # Also save as JPG
+        # Save PNG and JPG from a single render - use fixed figure size (no bbox_inches to prevent shifting)
         jpg_path = output_path.replace('.png', '.jpg')
-        plt.savefig(jpg_path, dpi=dpi, facecolor=self.bg_color, edgecolor='none', pad_inches=0, format='jpg')
-        
-        plt.close()
-        
-        print(f"\n✓ Wallpaper saved to:")
-        print(f"  PNG: {output_path}")
-        print(f"  JPG: {jpg_path}")
+        self._save_figure(fig, output_path, jpg_path,
+                          message=f"\n✓ Wallpaper saved to:\n  PNG: {output_path}\n  JPG: {jpg_path}")
     
     def create_landscape_wallpaper(self, home_lat: float, home_lon: float, approaches: List[Dict], stats: Dict, output_path: str):
         """Create 16:9 landscape wallpaper (1920x1080) with full radar visible"""
@@ -68,7 +151,7 @@ class WallpaperGenerator:
         height = 1080
         dpi = 100
         
-        fig, ax = plt.subplots(figsize=(width/dpi, height/dpi), dpi=dpi)
+        fig, ax = self._get_figure(width, height, dpi)
         fig.patch.set_facecolor(self.bg_color)
         ax.set_facecolor(self.bg_color)
         
@@ -85,15 +168,11 @@ class WallpaperGenerator:
         ax.spines['bottom'].set_visible(False)
         ax.spines['left'].set_visible(False)
         
-        plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
+        fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
         
         # Save as JPG only - use fixed figure size (no bbox_inches to prevent shifting)
         landscape_path = output_path.replace('.png', '_landscape.jpg')
-        plt.savefig(landscape_path, dpi=dpi, facecolor=self.bg_color, edgecolor='none', pad_inches=0, format='jpg')
-        
-        plt.close()
-        
-        print(f"  Landscape JPG: {landscape_path}")
+        self._save_figure(fig, landscape_path, message=f"  Landscape JPG: {landscape_path}")
     
     def _create_flight_wallpaper(self, ax, home_lat: float, home_lon: float, approaches: List[Dict], stats: Dict):
         """Create wallpaper with flight data"""
@@ -123,52 +202,14 @@ class WallpaperGenerator:
         self._draw_minimal_grid(ax, home_lat, home_lon, radius_degrees)
         
         # Draw neon pink radar circles (multiple for reference)
-        for i in range(1, int(self.config['radius_miles']) + 1):
-            circle_radius = self._miles_to_degrees(i, home_lat)
-            circle = Circle((home_lon, home_lat), circle_radius, fill=False, edgecolor=self.radar_color, 
-                           alpha=0.4, linewidth=2, linestyle='-')
-            ax.add_patch(circle)
+        self._draw_radar_circles(ax, home_lat, home_lon)
         
         # Plot home location as a simple pink dot
         ax.plot(home_lon, home_lat, marker='o', markersize=15, color=self.home_color, 
                zorder=1000, markeredgecolor=self.home_color, markeredgewidth=2)
         
         # Plot each flight with LARGER markers and CALLSIGN LABELS
-        for approach in approaches:
-            if approach['latitude'] is None or approach['longitude'] is None:
-                continue
-            
-            lat = approach['latitude']
-            lon = approach['longitude']
-            
-            # Draw line from home to approach point
-            ax.plot([home_lon, lon], [home_lat, lat], color=self.flight_color, 
-                   alpha=0.4, linewidth=1, zorder=1)
-            
-            # Use airplane marker (MUCH LARGER)
-            marker_size = self._get_marker_size(approach)
-            heading = approach.get('heading', 0)
-            if heading is None:
-                heading = 0
-            
-            # Plot airplane symbol (rotated triangle) - LARGER
-            ax.plot(lon, lat, marker=(3, 0, heading - 90), markersize=marker_size, 
-                   color=self.flight_color, alpha=0.9, zorder=10, 
-                   markeredgecolor=self.flight_color, markeredgewidth=1.5)
-            
-            # ADD CALLSIGN LABEL below aircraft with smart formatting
-            label = self._format_label(approach)
-            if label:
-                # Calculate offset in data coordinates for label placement
-                # Increased offset for more separation from aircraft
-                lat_range = ax.get_ylim()[1] - ax.get_ylim()[0]
-                label_offset = lat_range * 0.025  # Increased from 0.015 for more separation
-                
-                ax.text(lon, lat - label_offset, label, 
-                       fontsize=12, color=self.text_color, ha='center', va='top',  # Increased from 11
-                       fontweight='bold', zorder=11,
-                       bbox=dict(boxstyle='round,pad=0.4', facecolor='black', 
-                                edgecolor=self.flight_color, linewidth=1, alpha=0.9))
+        self._draw_flights(ax, home_lat, home_lon, approaches)
         
         self._add_text_info(ax, stats)
     
@@ -190,51 +231,79 @@ class WallpaperGenerator:
         self._draw_minimal_grid(ax, home_lat, home_lon, radius_degrees)
         
         # Draw neon pink radar circles
-        for i in range(1, int(self.config['radius_miles']) + 1):
-            circle_radius = self._miles_to_degrees(i, home_lat)
-            circle = Circle((home_lon, home_lat), circle_radius, fill=False, edgecolor=self.radar_color, 
-                           alpha=0.4, linewidth=2, linestyle='-')
-            ax.add_patch(circle)
+        self._draw_radar_circles(ax, home_lat, home_lon)
         
         # Plot home location
         ax.plot(home_lon, home_lat, marker='o', markersize=15, color=self.home_color, 
                zorder=1000, markeredgecolor=self.home_color, markeredgewidth=2)
         
         # Plot each flight
-        for approach in approaches:
-            if approach['latitude'] is None or approach['longitude'] is None:
-                continue
-            
-            lat = approach['latitude']
-            lon = approach['longitude']
-            
-            # Draw line from home to approach point
-            ax.plot([home_lon, lon], [home_lat, lat], color=self.flight_color, 
-                   alpha=0.4, linewidth=1, zorder=1)
-            
-            # Use airplane marker
-            marker_size = self._get_marker_size(approach)
-            heading = approach.get('heading', 0)
-            if heading is None:
-                heading = 0
-            
-            ax.plot(lon, lat, marker=(3, 0, heading - 90), markersize=marker_size, 
-                   color=self.flight_color, alpha=0.9, zorder=10, 
-                   markeredgecolor=self.flight_color, markeredgewidth=1.5)
-            
-            # ADD LABEL
-            label = self._format_label(approach)
+        self._draw_flights(ax, home_lat, home_lon, approaches)
+        
+        self._add_text_info(ax, stats)
+    
+    def _draw_flights(self, ax, home_lat: float, home_lon: float, approaches: List[Dict]):
+        """Draw home-to-aircraft lines, heading-rotated aircraft markers and callsign labels"""
+        flights, labelled = self._approach_array(approaches)
+        
+        # Draw line from home to each approach point - one artist, but each segment is stroked
+        # separately so overlapping lines still stack their alpha
+        segments = np.empty((len(flights), 2, 2))
+        segments[:, 0] = home_lon, home_lat
+        segments[:, 1, 0], segments[:, 1, 1] = flights['lon'], flights['lat']
+        ax.add_collection(LineCollection(segments, colors=self.flight_color, alpha=0.4, linewidths=1,
+                                         zorder=1), autolim=False)
+        
+        # Airplane symbols (rotated triangles) - all aircraft in a single collection
+        self._plot_aircraft_markers(ax, flights)
+        
+        # ADD CALLSIGN LABELS below aircraft with smart formatting
+        # Calculate offset in data coordinates for label placement
+        # Increased offset for more separation from aircraft
+        y_min, y_max = ax.get_ylim()
+        label_offset = (y_max - y_min) * 0.025  # Increased from 0.015 for more separation
+        labels = [self._format_label(approach) for approach in labelled]
+        self._draw_labels(ax, flights['lon'], flights['lat'] - label_offset, labels)
+    
+    def _draw_labels(self, ax, lons: np.ndarray, lats: np.ndarray, labels: List[str]):
+        """Draw labels with their own rounded box, so later labels cover earlier ones as before"""
+        for lon, lat, label in zip(lons, lats, labels):
             if label:
-                lat_range = ax.get_ylim()[1] - ax.get_ylim()[0]
-                label_offset = lat_range * 0.025  # Increased separation
-                
-                ax.text(lon, lat - label_offset, label, 
+                ax.text(lon, lat, label, 
                        fontsize=12, color=self.text_color, ha='center', va='top',  # Increased from 11
                        fontweight='bold', zorder=11,
                        bbox=dict(boxstyle='round,pad=0.4', facecolor='black', 
                                 edgecolor=self.flight_color, linewidth=1, alpha=0.9))
-        
-        self._add_text_info(ax, stats)
+    
+    def _approach_array(self, approaches: List[Dict]):
+        """
+        Pack approaches with a known position into a structured array (lat, lon, alt, hdg)
+        Returns the array and the matching approaches, row for row
+        """
+        valid = [a for a in approaches if a['latitude'] is not None and a['longitude'] is not None]
+        flights = np.array(
+            [(a['latitude'], a['longitude'], np.nan if a.get('altitude') is None else a['altitude'],
+              a.get('heading') or 0) for a in valid],
+            dtype=APPROACH_DTYPE
+        )
+        return flights, valid
+    
+    def _plot_aircraft_markers(self, ax, flights: np.ndarray):
+        """Plot heading-rotated aircraft triangles as one PathCollection"""
+        # Rotate the unit triangle marker once per aircraft with NumPy instead of one Line2D each
+        triangle = MarkerStyle((3, 0, 0))
+        base = triangle.get_path().transformed(triangle.get_transform())
+        angles = np.radians(flights['hdg'] - 90)
+        cos, sin = np.cos(angles)[:, None], np.sin(angles)[:, None]
+        x, y = base.vertices[:, 0], base.vertices[:, 1]
+        vertices = np.stack([x * cos - y * sin, x * sin + y * cos], axis=-1)
+        paths = [Path(v, base.codes) for v in vertices]
+        
+        # Scatter sizes are in points^2 (plot markersize squared)
+        markers = ax.scatter(flights['lon'], flights['lat'], s=self._get_marker_sizes(flights['alt'])**2,
+                             color=self.flight_color, alpha=0.9, zorder=10,
+                             edgecolors=self.flight_color, linewidths=1.5)
+        markers.set_paths(paths)
     
     def _create_empty_wallpaper(self, ax, home_lat: float, home_lon: float):
         """Create wallpaper when no flights found"""
@@ -257,11 +326,7 @@ class WallpaperGenerator:
         self._draw_minimal_grid(ax, home_lat, home_lon, radius_degrees)
         
         # Draw neon pink radar circles
-        for i in range(1, int(self.config['radius_miles']) + 1):
-            circle_radius = self._miles_to_degrees(i, home_lat)
-            circle = Circle((home_lon, home_lat), circle_radius, fill=False, edgecolor=self.radar_color,
-                           alpha=0.4, linewidth=2, linestyle='-')
-            ax.add_patch(circle)
+        self._draw_radar_circles(ax, home_lat, home_lon)
         
         # Plot home location as pink dot
         ax.plot(home_lon, home_lat, marker='o', markersize=15, color=self.home_color,
@@ -292,11 +357,7 @@ class WallpaperGenerator:
         self._draw_minimal_grid(ax, home_lat, home_lon, radius_degrees)
         
         # Draw neon pink radar circles
-        for i in range(1, int(self.config['radius_miles']) + 1):
-            circle_radius = self._miles_to_degrees(i, home_lat)
-            circle = Circle((home_lon, home_lat), circle_radius, fill=False, edgecolor=self.radar_color,
-                           alpha=0.4, linewidth=2, linestyle='-')
-            ax.add_patch(circle)
+        self._draw_radar_circles(ax, home_lat, home_lon)
         
         # Plot home location
         ax.plot(home_lon, home_lat, marker='o', markersize=15, color=self.home_color,
@@ -309,21 +370,33 @@ class WallpaperGenerator:
         ax.text(0.5, 0.88, 'within the search radius', transform=ax.transAxes, fontsize=16,
                color=self.text_color, ha='center', va='top', alpha=0.6)
     
+    def _draw_radar_circles(self, ax, home_lat: float, home_lon: float):
+        """Draw one radar circle per mile around home as a single LineCollection"""
+        theta = np.linspace(0, 2 * np.pi, 128)
+        radii = np.arange(1, int(self.config['radius_miles']) + 1) * self._degrees_per_mile(home_lat)
+        rings = np.stack([
+            home_lon + radii[:, None] * np.cos(theta),
+            home_lat + radii[:, None] * np.sin(theta)
+        ], axis=-1)
+        ax.add_collection(LineCollection(rings, colors=self.radar_color, alpha=0.4, linewidths=2,
+                                         linestyle='-', zorder=1), autolim=False)
+    
     def _draw_minimal_grid(self, ax, home_lat: float, home_lon: float, radius_degrees: float):
         """Draw a neon pink radar grid background"""
-        # Draw crosshairs
-        ax.axhline(y=home_lat, color=self.radar_color, alpha=0.3, linewidth=1.5, linestyle='-')
-        ax.axvline(x=home_lon, color=self.radar_color, alpha=0.3, linewidth=1.5, linestyle='-')
-        
-        # Draw diagonal guides
         xlim = ax.get_xlim()
         ylim = ax.get_ylim()
-        
-        # Calculate diagonal lines through center
-        ax.plot(xlim, [home_lat - (xlim[1]-home_lon), home_lat + (xlim[1]-home_lon)], 
-               color=self.radar_color, alpha=0.3, linewidth=1.5, linestyle='-')
-        ax.plot(xlim, [home_lat + (xlim[1]-home_lon), home_lat - (xlim[1]-home_lon)], 
-               color=self.radar_color, alpha=0.3, linewidth=1.5, linestyle='-')
+        half_width = xlim[1] - home_lon
+        
+        grid = [
+            # Crosshairs (spanning the locked view)
+            [(xlim[0], home_lat), (xlim[1], home_lat)],
+            [(home_lon, ylim[0]), (home_lon, ylim[1])],
+            # Diagonal guides through center
+            [(xlim[0], home_lat - half_width), (xlim[1], home_lat + half_width)],
+            [(xlim[0], home_lat + half_width), (xlim[1], home_lat - half_width)],
+        ]
+        ax.add_collection(LineCollection(grid, colors=self.radar_color, alpha=0.3, linewidths=1.5,
+                                         linestyle='-'), autolim=False)
     
     def _add_text_info(self, ax, stats: Dict):
         """Add statistics text"""
@@ -353,20 +426,19 @@ class WallpaperGenerator:
         label_parts = []
         
         # Line 1: Flight number/callsign
+        callsign = callsign.upper()
         if not callsign:
             flight_label = icao24.upper() if icao24 else 'UNKNOWN'
         elif callsign.isalpha():
-            flight_label = callsign.upper()  # Special callsigns like REDARROW
+            flight_label = callsign  # Special callsigns like REDARROW
         else:
             # Parse airline code + flight number (e.g., "RYR9630" → "RYR 9630")
-            import re
-            match = re.match(r'^([A-Z]{2,3})(\d+.*)$', callsign.upper())
+            match = self.CALLSIGN_RE.match(callsign)
             if match:
-                airline_code = match.group(1)
-                flight_num = match.group(2)
+                airline_code, flight_num = match.groups()
                 flight_label = f"{airline_code} {flight_num}"
             else:
-                flight_label = callsign.upper()
+                flight_label = callsign
         
         label_parts.append(flight_label)
         
@@ -380,61 +452,49 @@ class WallpaperGenerator:
         
         return '\n'.join(label_parts)
     
-    def _get_marker_size(self, approach: Dict) -> float:
-        """Calculate marker size based on altitude - LARGER for better visibility"""
-        altitude = approach.get('altitude')
-        if altitude is None:
-            return 31  # Larger default (28 * 1.1)
-        
-        altitude_feet = altitude * 3.28084
-        
-        # Larger sizes for better visibility (all increased by 10%)
-        if altitude_feet < 5000:
-            return 35  # was 32
-        elif altitude_feet < 15000:
-            return 33  # was 30
-        elif altitude_feet < 30000:
-            return 31  # was 28
-        else:
-            return 29  # was 26
+    def _get_marker_sizes(self, altitudes: np.ndarray) -> np.ndarray:
+        """Marker size per altitude in meters - LARGER for better visibility (NaN = unknown, sized 31)"""
+        altitude_feet = altitudes * 3.28084
+        # Bands below 5000 / 15000 / 30000 ft and above (all increased by 10%)
+        return np.select(
+            [np.isnan(altitude_feet), altitude_feet < 5000, altitude_feet < 15000, altitude_feet < 30000],
+            [31, 35, 33, 31],
+            default=29
+        )
     
     def _miles_to_degrees(self, miles: float, latitude: float) -> float:
         """Convert miles to approximate degrees"""
-        import math
-        lat_degrees = miles / 69.0
-        lon_degrees = miles / (69.0 * math.cos(math.radians(latitude)))
+        return miles * self._degrees_per_mile(latitude)
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _degrees_per_mile(latitude: float) -> float:
+        """Degrees per mile at a latitude (the larger of the lat/lon spans), cached per home location"""
+        lat_degrees = 1 / 69.0
+        lon_degrees = 1 / (69.0 * math.cos(math.radians(latitude)))
         return max(lat_degrees, lon_degrees)
     
-    def _get_altitude_color(self, altitude_meters: float) -> str:
-        """Map altitude to color gradient (deep purple -> hot pink -> light pink)"""
-        if altitude_meters is None:
-            return '#ff69b4'  # Default light pink
-        
-        altitude_feet = altitude_meters * 3.28084
-        
-        # Color gradient in pink/purple range based on altitude
-        if altitude_feet < 1000:
-            return '#8B008B'  # Deep magenta (very low)
-        elif altitude_feet < 5000:
-            return '#9932CC'  # Dark orchid (low)
-        elif altitude_feet < 10000:
-            return '#C71585'  # Medium violet red (medium-low)
-        elif altitude_feet < 15000:
-            return '#FF1493'  # Deep pink (medium)
-        elif altitude_feet < 25000:
-            return '#FF69B4'  # Hot pink (medium-high)
-        elif altitude_feet < 35000:
-            return '#FFB6C1'  # Light pink (high)
-        else:
-            return '#FFC0CB'  # Very light pink (very high)
+    def _get_altitude_colors(self, altitudes: np.ndarray) -> np.ndarray:
+        """Map altitudes in meters to a color gradient (deep purple -> hot pink -> light pink, NaN = unknown)"""
+        altitude_feet = altitudes * 3.28084
+        return np.select(
+            [np.isnan(altitude_feet), altitude_feet < 1000, altitude_feet < 5000, altitude_feet < 10000,
+             altitude_feet < 15000, altitude_feet < 25000, altitude_feet < 35000],
+            ['#ff69b4',   # Default light pink (unknown)
+             '#8B008B',   # Deep magenta (very low)
+             '#9932CC',   # Dark orchid (low)
+             '#C71585',   # Medium violet red (medium-low)
+             '#FF1493',   # Deep pink (medium)
+             '#FF69B4',   # Hot pink (medium-high)
+             '#FFB6C1'],  # Light pink (high)
+            default='#FFC0CB'  # Very light pink (very high)
+        )
     
     def create_artistic_wallpaper(self, home_lat: float, home_lon: float, approaches: List[Dict], stats: Dict, output_path: str):
         """Create artistic wallpaper with directional triangles and altitude colors - NO LABELS"""
         dpi = 100
-        fig_width = self.width / dpi
-        fig_height = self.height / dpi
         
-        fig, ax = plt.subplots(figsize=(fig_width, fig_height), dpi=dpi)
+        fig, ax = self._get_figure(self.width, self.height, dpi)
         fig.patch.set_facecolor(self.bg_color)
         ax.set_facecolor(self.bg_color)
         
@@ -448,21 +508,14 @@ class WallpaperGenerator:
         ax.spines['bottom'].set_visible(False)
         ax.spines['left'].set_visible(False)
         
-        plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
+        fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
         
         # Save as JPG for artistic version
         artistic_path = output_path.replace('.png', '_artistic.jpg')
-        plt.savefig(artistic_path, dpi=dpi, facecolor=self.bg_color, edgecolor='none', pad_inches=0, format='jpg')
-        
-        plt.close()
-        
-        print(f"  Artistic JPG: {artistic_path}")
+        self._save_figure(fig, artistic_path, message=f"  Artistic JPG: {artistic_path}")
     
     def _create_artistic_flight_wallpaper(self, ax, home_lat: float, home_lon: float, approaches: List[Dict], stats: Dict):
         """Create artistic wallpaper with altitude-colored directional triangles, NO LABELS"""
-        from matplotlib.path import Path
-        import matplotlib.patches as patches
-        
         # Fixed view for portrait phone
         radius_degrees = self._miles_to_degrees(self.config['radius_miles'], home_lat)
         v_margin = radius_degrees * 1.05
@@ -477,70 +530,14 @@ class WallpaperGenerator:
         self._draw_minimal_grid(ax, home_lat, home_lon, radius_degrees)
         
         # Draw radar circles
-        for i in range(1, int(self.config['radius_miles']) + 1):
-            circle_radius = self._miles_to_degrees(i, home_lat)
-            circle = Circle((home_lon, home_lat), circle_radius, fill=False, edgecolor=self.radar_color,
-                           alpha=0.4, linewidth=2, linestyle='-')
-            ax.add_patch(circle)
+        self._draw_radar_circles(ax, home_lat, home_lon)
         
         # Plot home location
         ax.plot(home_lon, home_lat, marker='o', markersize=15, color=self.home_color,
                zorder=1000, markeredgecolor=self.home_color, markeredgewidth=2)
         
         # Plot each flight with directional triangles and altitude colors
-        for approach in approaches:
-            if approach['latitude'] is None or approach['longitude'] is None:
-                continue
-            
-            lat = approach['latitude']
-            lon = approach['longitude']
-            altitude = approach.get('altitude')
-            
-            # Get color based on altitude
-            aircraft_color = self._get_altitude_color(altitude)
-            
-            # NO connecting lines - cleaner abstract look
-            
-            # Get heading and size
-            heading = approach.get('heading', 0)
-            if heading is None:
-                heading = 0
-            marker_size = self._get_marker_size(approach) * 1.5  # Significantly larger for artistic view
-            
-            # Draw directional arrow/triangle (narrower at front)
-            # Create custom path for isosceles triangle pointing in flight direction
-            import math
-            
-            # Convert heading to radians (0° = North, clockwise)
-            angle_rad = math.radians(heading - 90)  # Adjust for matplotlib coordinates
-            
-            # Define triangle shape (narrower at front, wider at back)
-            # Scale based on map coordinates - larger triangles
-            triangle_length = marker_size * 0.0001  # Doubled from 0.00005
-            triangle_width = triangle_length * 0.5   # Narrower width for better directionality
-            
-            # Calculate triangle points relative to aircraft position
-            front_x = lon + triangle_length * math.cos(angle_rad)
-            front_y = lat + triangle_length * math.sin(angle_rad)
-            
-            back_x = lon - triangle_length * 0.4 * math.cos(angle_rad)
-            back_y = lat - triangle_length * 0.4 * math.sin(angle_rad)
-            
-            left_x = back_x - triangle_width * math.sin(angle_rad)
-            left_y = back_y + triangle_width * math.cos(angle_rad)
-            
-            right_x = back_x + triangle_width * math.sin(angle_rad)
-            right_y = back_y - triangle_width * math.cos(angle_rad)
-            
-            # Create triangle path
-            verts = [(front_x, front_y), (left_x, left_y), (right_x, right_y), (front_x, front_y)]
-            codes = [Path.MOVETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY]
-            path = Path(verts, codes)
-            
-            # Draw triangle
-            patch = patches.PathPatch(path, facecolor=aircraft_color, edgecolor=aircraft_color,
-                                     linewidth=1.5, alpha=0.9, zorder=10)
-            ax.add_patch(patch)
+        self._draw_artistic_triangles(ax, approaches)
         
         # Add stylish travel poster-style text in top left
         from datetime import datetime
@@ -572,6 +569,34 @@ class WallpaperGenerator:
         
         # NO additional stats - pure minimal aesthetic
     
+    def _draw_artistic_triangles(self, ax, approaches: List[Dict]):
+        """Draw altitude-colored isosceles triangles pointing along each heading as one PolyCollection"""
+        flights, _ = self._approach_array(approaches)
+        
+        # NO connecting lines - cleaner abstract look
+        
+        # Convert heading to radians (0° = North, clockwise)
+        angle_rad = np.radians(flights['hdg'] - 90)  # Adjust for matplotlib coordinates
+        cos, sin = np.cos(angle_rad), np.sin(angle_rad)
+        
+        # Define triangle shape (narrower at front, wider at back)
+        # Scale based on map coordinates - significantly larger for artistic view
+        triangle_length = self._get_marker_sizes(flights['alt']) * 1.5 * 0.0001
+        triangle_width = triangle_length * 0.5   # Narrower width for better directionality
+        
+        # Calculate triangle points relative to aircraft position
+        lon, lat = flights['lon'], flights['lat']
+        front = np.column_stack([lon + triangle_length * cos, lat + triangle_length * sin])
+        back_x = lon - triangle_length * 0.4 * cos
+        back_y = lat - triangle_length * 0.4 * sin
+        left = np.column_stack([back_x - triangle_width * sin, back_y + triangle_width * cos])
+        right = np.column_stack([back_x + triangle_width * sin, back_y - triangle_width * cos])
+        
+        colors = self._get_altitude_colors(flights['alt'])
+        ax.add_collection(PolyCollection(np.stack([front, left, right], axis=1),
+                                         facecolors=colors, edgecolors=colors,
+                                         linewidths=1.5, alpha=0.9, zorder=10), autolim=False)
+    
     def create_artistic_landscape_wallpaper(self, home_lat: float, home_lon: float, approaches: List[Dict], stats: Dict, output_path: str):
         """Create artistic 16:9 landscape wallpaper with altitude colors and directional triangles"""
         # 16:9 landscape dimensions
@@ -579,7 +604,7 @@ class WallpaperGenerator:
         height = 1080
         dpi = 100
         
-        fig, ax = plt.subplots(figsize=(width/dpi, height/dpi), dpi=dpi)
+        fig, ax = self._get_figure(width, height, dpi)
         fig.patch.set_facecolor(self.bg_color)
         ax.set_facecolor(self.bg_color)
         
@@ -593,7 +618,7 @@ class WallpaperGenerator:
         ax.spines['bottom'].set_visible(False)
         ax.spines['left'].set_visible(False)
         
-        plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
+        fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
         
         # Add text using FIGURE coordinates (not axes) - positions at actual screen corner
         from datetime import datetime
@@ -624,17 +649,10 @@ class WallpaperGenerator:
         
         # Save as JPG
         artistic_landscape_path = output_path.replace('.png', '_artistic_landscape.jpg')
-        plt.savefig(artistic_landscape_path, dpi=dpi, facecolor=self.bg_color, edgecolor='none', pad_inches=0, format='jpg')
-        
-        plt.close()
-        
-        print(f"  Artistic Landscape JPG: {artistic_landscape_path}")
+        self._save_figure(fig, artistic_landscape_path, message=f"  Artistic Landscape JPG: {artistic_landscape_path}")
     
     def _create_artistic_landscape_wallpaper(self, ax, home_lat: float, home_lon: float, approaches: List[Dict], stats: Dict):
         """Create artistic landscape wallpaper with altitude-colored directional triangles, NO LABELS"""
-        from matplotlib.path import Path
-        import matplotlib.patches as patches
-        
         # Fixed view for landscape - full radar visible
         radius_degrees = self._miles_to_degrees(self.config['radius_miles'], home_lat)
         margin = radius_degrees * 1.05
@@ -648,65 +666,13 @@ class WallpaperGenerator:
         self._draw_minimal_grid(ax, home_lat, home_lon, radius_degrees)
         
         # Draw radar circles
-        for i in range(1, int(self.config['radius_miles']) + 1):
-            circle_radius = self._miles_to_degrees(i, home_lat)
-            circle = Circle((home_lon, home_lat), circle_radius, fill=False, edgecolor=self.radar_color,
-                           alpha=0.4, linewidth=2, linestyle='-')
-            ax.add_patch(circle)
+        self._draw_radar_circles(ax, home_lat, home_lon)
         
         # Plot home location
         ax.plot(home_lon, home_lat, marker='o', markersize=15, color=self.home_color,
                zorder=1000, markeredgecolor=self.home_color, markeredgewidth=2)
         
         # Plot each flight with directional triangles and altitude colors
-        for approach in approaches:
-            if approach['latitude'] is None or approach['longitude'] is None:
-                continue
-            
-            lat = approach['latitude']
-            lon = approach['longitude']
-            altitude = approach.get('altitude')
-            
-            # Get color based on altitude
-            aircraft_color = self._get_altitude_color(altitude)
-            
-            # NO connecting lines - cleaner abstract look
-            
-            # Get heading and size
-            heading = approach.get('heading', 0)
-            if heading is None:
-                heading = 0
-            marker_size = self._get_marker_size(approach) * 1.5
-            
-            # Draw directional arrow/triangle
-            import math
-            
-            angle_rad = math.radians(heading - 90)
-            
-            triangle_length = marker_size * 0.0001
-            triangle_width = triangle_length * 0.5
-            
-            # Calculate triangle points
-            front_x = lon + triangle_length * math.cos(angle_rad)
-            front_y = lat + triangle_length * math.sin(angle_rad)
-            
-            back_x = lon - triangle_length * 0.4 * math.cos(angle_rad)
-            back_y = lat - triangle_length * 0.4 * math.sin(angle_rad)
-            
-            left_x = back_x - triangle_width * math.sin(angle_rad)
-            left_y = back_y + triangle_width * math.cos(angle_rad)
-            
-            right_x = back_x + triangle_width * math.sin(angle_rad)
-            right_y = back_y - triangle_width * math.cos(angle_rad)
-            
-            # Create triangle path
-            verts = [(front_x, front_y), (left_x, left_y), (right_x, right_y), (front_x, front_y)]
-            codes = [Path.MOVETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY]
-            path = Path(verts, codes)
-            
-            # Draw triangle
-            patch = patches.PathPatch(path, facecolor=aircraft_color, edgecolor=aircraft_color,
-                                     linewidth=1.5, alpha=0.9, zorder=10)
-            ax.add_patch(patch)
+        self._draw_artistic_triangles(ax, approaches)
         
         # Text is now added at figure level, not here
\ No newline at end of file
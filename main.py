@@ -33,6 +33,8 @@ def main():
     parser.add_argument('--scenario', default='normal', choices=['normal', 'busy', 'quiet', 'overnight'],
                        help='Demo scenario (only with --demo)')
     parser.add_argument('--no-routes', action='store_true', help='Skip fetching origin/destination data')
+    parser.add_argument('--background-save', action='store_true',
+                       help='Encode images in a background worker process (usually slower, the encode is short)')
     args = parser.parse_args()
     
     print("=" * 60)
@@ -135,7 +137,7 @@ def main():
     suffix = '_demo' if args.demo else ''
     output_file = output_dir / f'wallpaper_{timestamp}{suffix}.png'
     
-    generator = WallpaperGenerator(config)
+    generator = WallpaperGenerator(config, background_save=args.background_save)
     
     # Generate portrait version (PNG + JPG)
     generator.create_wallpaper(home_lat, home_lon, approaches, stats, str(output_file))
@@ -146,6 +148,9 @@ def main():
     # Generate artistic version (JPG only) - altitude colors, directional triangles, no labels
     generator.create_artistic_wallpaper(home_lat, home_lon, approaches, stats, str(output_file))
     
+    # Wait for the background saves to land on disk
+    generator.wait()
+    
     print()
     print("=" * 60)
     print("✓ Complete!")
@@ -2,8 +2,12 @@
 Process flight data and calculate closest approaches
 """
 import math
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Tuple
 
+import numpy as np
+
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """Calculate distance between two points in miles"""
@@ -20,6 +24,7 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
+@lru_cache(maxsize=128)
 def miles_to_degrees(miles: float, latitude: float) -> float:
     """Convert miles to approximate degrees at given latitude"""
     lat_degrees = miles / 69.0
@@ -27,6 +32,30 @@ def miles_to_degrees(miles: float, latitude: float) -> float:
     return max(lat_degrees, lon_degrees)
 
 
+@dataclass
+class FlightTable:
+    """Flight states stored column-wise - one NumPy array per field, row-aligned with records"""
+    icao24: np.ndarray     # str (object), normalised to stripped lower-case for grouping
+    latitude: np.ndarray   # float32 (~1 m resolution, well inside ADS-B accuracy), NaN where unknown
+    longitude: np.ndarray  # float32, NaN where unknown
+    records: List[Dict]    # source state dicts, used to build the output
+    
+    @classmethod
+    def from_flights(cls, flights: List[Dict]) -> 'FlightTable':
+        """Build the table from parsed flight states, skipping states without an ICAO24"""
+        records = [flight for flight in flights if flight.get('icao24')]
+        return cls(
+            # FR24 reports hex codes upper-case and OpenSky lower-case; group them as one aircraft
+            icao24=np.array([flight['icao24'].strip().lower() for flight in records], dtype=object),
+            latitude=np.array([flight.get('latitude') for flight in records], dtype=np.float32),
+            longitude=np.array([flight.get('longitude') for flight in records], dtype=np.float32),
+            records=records
+        )
+    
+    def __len__(self) -> int:
+        return len(self.records)
+
+
 class FlightProcessor:
     """Process flight data and find closest approaches"""
     
@@ -34,58 +63,101 @@ class FlightProcessor:
         self.home_lat = home_lat
         self.home_lon = home_lon
         self.radius_miles = radius_miles
+        
+        # Home trig constants, shared by every distance calculation
+        self._home_lat_rad = math.radians(home_lat)
+        self._cos_home_lat = math.cos(self._home_lat_rad)
+        self._miles_per_degree_lon = 69.0 * self._cos_home_lat
     
     def process_flights(self, flights: List[Dict]) -> List[Dict]:
         """
         Process flights and find closest approach points
         Groups by ICAO24 and finds the point closest to home for each aircraft
         """
-        # Group flights by aircraft
-        aircraft_flights = {}
-        for flight in flights:
-            icao24 = flight.get('icao24')
-            if not icao24:
-                continue
-            
-            if icao24 not in aircraft_flights:
-                aircraft_flights[icao24] = []
-            aircraft_flights[icao24].append(flight)
+        table = FlightTable.from_flights(flights)
+        
+        # Integer aircraft ids (np.unique orders them by ICAO24)
+        icao24s, first_seen, aircraft_ids = np.unique(table.icao24, return_index=True, return_inverse=True)
+        aircraft_ids = aircraft_ids.astype(np.int32)
         
         print(f"Processing {len(flights)} flight states...")
-        print(f"Filtered {len(aircraft_flights)} states within {self.radius_miles} miles")
-        print(f"Found {len(aircraft_flights)} unique aircraft")
+        print(f"Filtered {len(icao24s)} states within {self.radius_miles} miles")
+        print(f"Found {len(icao24s)} unique aircraft")
+        
+        closest_indices, closest_distances = self._find_closest_approaches(table, aircraft_ids, len(icao24s))
         
-        # Find closest approach for each aircraft
-        approaches = []
-        for icao24, aircraft_states in aircraft_flights.items():
-            closest = self._find_closest_approach(aircraft_states)
-            if closest:
-                approaches.append(closest)
+        # Build results in the order aircraft were first seen, skipping aircraft with no position
+        order = np.argsort(first_seen)
+        order = order[np.isfinite(closest_distances[order])]
+        approaches = [
+            self._build_approach(table.records[index], distance)
+            for index, distance in zip(closest_indices[order].tolist(), closest_distances[order].tolist())
+        ]
         
         print(f"Identified {len(approaches)} aircraft with closest approaches")
         return approaches
     
-    def _find_closest_approach(self, states: List[Dict]) -> Dict:
-        """Find the closest point to home for this aircraft"""
-        closest_state = None
-        closest_distance = float('inf')
-        
-        for state in states:
-            lat = state.get('latitude')
-            lon = state.get('longitude')
-            
-            if lat is None or lon is None:
-                continue
-            
-            distance = haversine_distance(self.home_lat, self.home_lon, lat, lon)
-            
-            if distance < closest_distance:  # Show all aircraft, don't filter by radius here
-                closest_distance = distance
-                closest_state = state
-        
-        if closest_state is None:
-            return None
+    def _find_closest_approaches(self, table: FlightTable, aircraft_ids: np.ndarray,
+                                 num_aircraft: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the closest point to home for every aircraft
+        Returns (state index, distance in miles) per aircraft id; distance is inf when no position is known
+        """
+        # Show all aircraft, don't filter by radius here
+        
+        # Cheap equirectangular distance (squared, in miles) - accurate enough within the
+        # search area to pick each aircraft's closest point
+        dlat_miles = (table.latitude - self.home_lat) * 69.0
+        dlon_miles = (table.longitude - self.home_lon) * self._miles_per_degree_lon
+        sq_distances = dlat_miles**2 + dlon_miles**2
+        
+        # Running per-aircraft minimum, scattered straight from the unsorted states (fmin skips unknown positions)
+        min_sq_distances = np.full(num_aircraft, np.nan, dtype=np.float32)
+        np.fmin.at(min_sq_distances, aircraft_ids, sq_distances)
         
+        # Only run the exact haversine on states within 2% of their aircraft's cheap-metric minimum
+        candidates = np.flatnonzero(sq_distances <= min_sq_distances[aircraft_ids] * 1.02**2)
+        candidate_ids = aircraft_ids[candidates]
+        distances = self._distances_to_home(table.latitude[candidates], table.longitude[candidates])
+        
+        best_distances = np.full(num_aircraft, np.inf, dtype=np.float32)
+        np.minimum.at(best_distances, candidate_ids, distances)
+        
+        # First state (in input order) that reaches its aircraft's best distance
+        winners = distances == best_distances[candidate_ids]
+        best_indices = np.full(num_aircraft, len(table), dtype=np.intp)
+        np.minimum.at(best_indices, candidate_ids[winners], candidates[winners])
+        
+        return best_indices, best_distances
+    
+    def _distances_to_home(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Haversine distances in miles from home to arrays of points (keeps the input float dtype)"""
+        R = 3959  # Earth's radius in miles
+        
+        lats_rad = np.radians(lats)
+        
+        # Fused in place over two buffers instead of allocating a temporary per ufunc
+        a = np.subtract(lats_rad, self._home_lat_rad)
+        a *= 0.5
+        np.sin(a, out=a)
+        np.square(a, out=a)
+        
+        b = np.radians(np.subtract(lons, self.home_lon))
+        b *= 0.5
+        np.sin(b, out=b)
+        np.square(b, out=b)
+        b *= np.cos(lats_rad, out=lats_rad)
+        b *= self._cos_home_lat
+        
+        a += b
+        np.sqrt(a, out=a)
+        np.arcsin(a, out=a)
+        a *= 2 * R
+        
+        return a
+    
+    def _build_approach(self, closest_state: Dict, closest_distance: float) -> Dict:
+        """Build the closest approach record for one aircraft"""
         return {
             'icao24': closest_state['icao24'],
             'callsign': closest_state.get('callsign'),
@@ -114,25 +186,22 @@ class FlightProcessor:
                 'average_altitude': None
             }
         
-        distances = [a['distance'] for a in approaches]
-        altitudes = []
-        
-        for a in approaches:
-            if a['altitude'] is not None:
-                # Convert meters to feet
-                altitudes.append(a['altitude'] * 3.28084)
+        distances = np.fromiter((a['distance'] for a in approaches), dtype=np.float64, count=len(approaches))
+        # Convert meters to feet
+        altitudes = np.array([a['altitude'] for a in approaches if a['altitude'] is not None], dtype=np.float64)
+        altitudes *= 3.28084
         
         stats = {
             'total_aircraft': len(approaches),
-            'closest_distance': min(distances),
-            'furthest_distance': max(distances),
-            'average_distance': sum(distances) / len(distances)
+            'closest_distance': float(distances.min()),
+            'furthest_distance': float(distances.max()),
+            'average_distance': float(distances.mean())
         }
         
-        if altitudes:
-            stats['min_altitude'] = min(altitudes)
-            stats['max_altitude'] = max(altitudes)
-            stats['average_altitude'] = sum(altitudes) / len(altitudes)
+        if altitudes.size:
+            stats['min_altitude'] = float(altitudes.min())
+            stats['max_altitude'] = float(altitudes.max())
+            stats['average_altitude'] = float(altitudes.mean())
         else:
             stats['min_altitude'] = None
             stats['max_altitude'] = None
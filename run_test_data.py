@@ -1,8 +1,8 @@
 """
 Generate wallpapers from your test data
 """
-import json
 from pathlib import Path
+from fetch_flights import load_flight_data
 from generate_image import WallpaperGenerator
 from process_data import FlightProcessor
 
@@ -11,8 +11,7 @@ print("Testing with your captured flight data")
 print("=" * 60)
 
 # Load your test data
-with open('your_test_data.json', 'r') as f:
-    flights = json.load(f)
+flights = load_flight_data('your_test_data.json')
 
 print(f"\nLoaded {len(flights)} flight records")
 